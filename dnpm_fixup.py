@@ -28,12 +28,78 @@ SOFTWARE.
 """
 
 import argparse
-import csv
+import io
 import json
 import os
+import re
+import stat
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Streaming with ijson walks every token in Python, which is slower than a
+# full orjson parse, so it is only worth it when orjson is not installed
+USE_IJSON = ijson is not None and orjson is None
+
+
+# Input file kinds, as shown in console output
+PATIENT_RECORD = 'patient record'
+SUBMISSION_REPORT = 'submission report'
+
+# Number of files processed as one unit of work, in a worker process or in
+# the main process; only counters and console lines are kept between chunks
+CHUNK_SIZE = 500
+
+# Number of console lines collected before they are written to stdout
+LOG_BATCH_SIZE = 1000
+
+# Threads used for reading and for writing files, and the maximum number of
+# files read ahead of processing or waiting to be written
+IO_THREADS = 4
+READ_AHEAD_LIMIT = 8
+
+# Classifies input filenames and extracts the embedded TAN (..._TAN_<TAN>.json)
+# in one match; group 2 is None if the filename does not contain a TAN. TANs
+# are compared case-sensitively, so only the uppercase form used in the config
+# is trusted; for other names the TAN is read from the file contents
+INPUT_FILE_RE = re.compile(
+    r'^(MVH_MTBPatientRecord_Patient|SubmissionReport_Patient)(?:.*_TAN_([0-9A-F]{64})|.*)\.json$'
+)
+FILE_KINDS = {
+    'MVH_MTBPatientRecord_Patient': PATIENT_RECORD,
+    'SubmissionReport_Patient': SUBMISSION_REPORT,
+}
+
+# Exceptions raised for malformed JSON by the parsers in use
+JSON_ERRORS = (json.JSONDecodeError,) + ((ijson.JSONError,) if ijson is not None else ())
+
+# Characters that would need escaping inside a JSON string
+JSON_UNSAFE_RE = re.compile(rb'["\\\x00-\x1f]')
+
+# Integers this long may not fit in 64 bits, which orjson would read as a
+# float; such files are read and written with the stdlib json module
+LONG_NUMBER_RE = re.compile(rb'\d{19,}')
+
+# Matches a "submittedAt" key and captures its string value (without quotes)
+SUBMITTED_AT_RE = re.compile(rb'"submittedAt"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+class NewDate(NamedTuple):
+    """A date from the config, kept both as text and UTF-8 encoded so neither is converted per file."""
+    text: str
+    utf8: bytes
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -64,6 +130,9 @@ Input File Types:
 
 Only files with TANs matching config entries are written to the output directory.
 Files are written with UTF-8 encoding and 2-space indentation.
+If ijson is installed and orjson is not, the date in patient records is
+replaced in the file contents instead, so they keep the formatting of the
+input file (including any missing trailing newline).
 
 License:
   MIT License
@@ -92,28 +161,40 @@ License:
         metavar='<output_directory>',
         help='Output directory for corrected JSON files (must already exist)'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar='<n>',
+        help='Number of worker processes used to process files (default: number of CPUs)'
+    )
 
     return parser.parse_args()
 
 
 def validate_paths(config_path: str, in_dir: str, out_dir: str) -> bool:
     """Validate that config file and directories exist."""
-    if not os.path.isfile(config_path):
-        print(f"Error: Config file not found: {config_path}", file=sys.stderr)
-        return False
+    checks = (
+        (config_path, stat.S_ISREG, "Config file"),
+        (in_dir, stat.S_ISDIR, "Input directory"),
+        (out_dir, stat.S_ISDIR, "Output directory"),
+    )
 
-    if not os.path.isdir(in_dir):
-        print(f"Error: Input directory not found: {in_dir}", file=sys.stderr)
-        return False
+    # One stat per path; the mode answers both "exists" and "right type"
+    for path, has_expected_type, label in checks:
+        try:
+            mode = Path(path).stat().st_mode
+        except (OSError, ValueError):
+            mode = None
 
-    if not os.path.isdir(out_dir):
-        print(f"Error: Output directory not found: {out_dir}", file=sys.stderr)
-        return False
+        if mode is None or not has_expected_type(mode):
+            print(f"Error: {label} not found: {path}", file=sys.stderr)
+            return False
 
     return True
 
 
-def parse_config_file(config_path: str) -> Dict[str, str]:
+def parse_config_file(config_path: str) -> Dict[str, NewDate]:
     """
     Parse the CSV config file and return a dictionary mapping TAN to date.
 
@@ -127,13 +208,16 @@ def parse_config_file(config_path: str) -> Dict[str, str]:
 
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if len(row) >= 2:
-                    tan = row[0].strip()
-                    date = row[1].strip()
-                    if tan and date:
-                        tan_date_map[tan] = date
+            # Plain TAN,DATE lines without quoting, so no csv module needed
+            for line in f:
+                tan, sep, rest = line.partition(',')
+                if not sep:
+                    continue
+                tan = tan.strip()
+                date = rest.partition(',')[0].strip()
+                if tan and date:
+                    # Encoded once here instead of for every file written
+                    tan_date_map[tan] = NewDate(date, date.encode('utf-8'))
     except Exception as e:
         print(f"Error reading config file: {e}", file=sys.stderr)
         return {}
@@ -141,97 +225,353 @@ def parse_config_file(config_path: str) -> Dict[str, str]:
     return tan_date_map
 
 
-def get_json_files(in_dir: str) -> Tuple[List[str], List[str]]:
+def get_json_files(in_dir: str, tan_date_map: Dict[str, NewDate]) -> Tuple[Dict[Optional[str], List[Tuple[str, str, str, Optional[str]]]], int, int]:
     """
-    Get lists of patient record files and submission report files from input directory.
+    Get patient record files and submission report files from input directory, indexed by TAN.
 
     Args:
         in_dir: Path to input directory
+        tan_date_map: Dictionary mapping TAN to new date; files whose filename
+            TAN is not in it are counted but not indexed
+
+    Returns:
+        Tuple of (files_by_tan, patient_record_count, submission_report_count).
+        files_by_tan maps the TAN taken from the filename to a list of
+        (kind, filename, filepath, TAN) tuples; files whose name does not
+        contain a TAN are listed under None.
+    """
+    files_by_tan = {}
+    patient_record_count = 0
+    submission_report_count = 0
+
+    with os.scandir(in_dir) as entries:
+        for entry in entries:
+            filename = entry.name
+            match = INPUT_FILE_RE.match(filename)
+            if not match:
+                continue
+
+            # Uses the file type cached from the directory listing; only symlinks need a stat
+            if not entry.is_file():
+                continue
+
+            prefix, tan = match.groups()
+            kind = FILE_KINDS[prefix]
+            if kind == PATIENT_RECORD:
+                patient_record_count += 1
+            else:
+                submission_report_count += 1
+
+            if tan is not None and tan not in tan_date_map:
+                continue
+
+            files_by_tan.setdefault(tan, []).append((kind, filename, entry.path, tan))
+
+    return files_by_tan, patient_record_count, submission_report_count
+
+
+def read_input_file(filepath: str) -> bytes:
+    """
+    Read the whole contents of an input file.
+
+    The size is taken from fstat, so the file is normally read into one
+    buffer with a single read call instead of growing it chunk by chunk.
+
+    Args:
+        filepath: Path to the file
 
     Returns:
-        Tuple of (patient_record_files, submission_report_files)
+        File contents
+
+    Raises:
+        OSError: If the file cannot be read
     """
-    patient_record_files = []
-    submission_report_files = []
+    with open(filepath, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        raw = f.read(size)
+        while len(raw) < size:
+            # Short read, e.g. on network file systems
+            chunk = f.read(size - len(raw))
+            if not chunk:
+                break
+            raw += chunk
 
-    for filename in os.listdir(in_dir):
-        if not filename.endswith('.json'):
-            continue
+    return raw
 
-        filepath = os.path.join(in_dir, filename)
-        if not os.path.isfile(filepath):
-            continue
 
-        if filename.startswith('MVH_MTBPatientRecord_Patient'):
-            patient_record_files.append(filename)
-        elif filename.startswith('SubmissionReport_Patient'):
-            submission_report_files.append(filename)
+def parse_json(raw: bytes) -> Tuple[object, bool]:
+    """
+    Parse the contents of a JSON file, using orjson if it is installed.
 
-    return patient_record_files, submission_report_files
+    The stdlib json module is used instead for files orjson would not read
+    back exactly, i.e. with NaN, Infinity, out of range floats or integers
+    beyond 64 bit. The data must be written with dump_json using the same
+    parser, as orjson would write such values as null.
 
+    Args:
+        raw: File contents
 
-def process_patient_record(filepath: str, tan_date_map: Dict[str, str]) -> Optional[Tuple[str, str, dict]]:
+    Returns:
+        Tuple of (parsed JSON data, True if orjson was used)
+
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON (orjson's error is a subclass)
+        UnicodeDecodeError: If the file is not valid UTF-8
+    """
+    if orjson is not None and not LONG_NUMBER_RE.search(raw):
+        try:
+            return orjson.loads(raw), True
+        except orjson.JSONDecodeError:
+            # orjson is stricter than the stdlib (e.g. NaN); let json decide
+            pass
+
+    return json.loads(raw.decode('utf-8')), False
+
+
+def dump_json(data, use_orjson: bool) -> bytes:
     """
-    Process a patient record file and check if it needs fixing.
+    Serialize JSON data as UTF-8 with 2-space indentation and a trailing newline.
 
     Args:
-        filepath: Path to the patient record JSON file
-        tan_date_map: Dictionary mapping TAN to new date
+        data: JSON data to serialize
+        use_orjson: Whether the data was parsed with orjson (see parse_json)
+
+    Returns:
+        Serialized file contents
+    """
+    if use_orjson:
+        # orjson always emits UTF-8, so ensure_ascii=False is implicit
+        return orjson.dumps(
+            data,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        )
+
+    return (json.dumps(data, indent=2, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def scan_patient_record(f: BinaryIO) -> Tuple[Optional[str], int, Optional[str]]:
+    """
+    Stream a patient record with ijson without building the JSON tree.
+
+    Args:
+        f: Binary file object with the patient record
 
     Returns:
-        Tuple of (TAN, new_date, modified_data) if file needs fixing, None otherwise
+        Tuple of (metadata.transferTAN or None, number of top-level submittedAt
+        keys with a string value, the last such value or None)
     """
+    tan = None
+    submitted_at_count = 0
+    submitted_at = None
+
+    for prefix, event, value in ijson.parse(f):
+        if prefix == 'metadata.transferTAN' and event == 'string':
+            tan = value
+        elif prefix == 'submittedAt' and event == 'string':
+            submitted_at_count += 1
+            submitted_at = value
+
+    return tan, submitted_at_count, submitted_at
+
+
+def peek_patient_record_tan(f: BinaryIO) -> Optional[str]:
+    """
+    Read the transferTAN of a patient record with ijson, stopping as soon as it is found.
+
+    Args:
+        f: Binary file object with the patient record
+
+    Returns:
+        Value of metadata.transferTAN, or None if there is none
+    """
+    return next(ijson.items(f, 'metadata.transferTAN'), None)
+
+
+def peek_submission_report_tan(f: BinaryIO) -> Optional[str]:
+    """
+    Read the id of a submission report with ijson, stopping as soon as it is found.
+
+    Args:
+        f: Binary file object with the submission report
+
+    Returns:
+        Value of the top-level id field, or None if there is none
+    """
+    return next(ijson.items(f, 'id'), None)
+
+
+def decode_json_string(value: bytes) -> Optional[str]:
+    """Decode the contents of a JSON string literal (without quotes), or return None if invalid."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"Error: File is not valid JSON: {filepath} - {e}", file=sys.stderr)
+        return json.loads(b'"' + value + b'"')
+    except ValueError:
         return None
-    except Exception as e:
-        print(f"Error reading file: {filepath} - {e}", file=sys.stderr)
+
+
+def find_date_field(raw: bytes, field_re: re.Pattern) -> Optional[Tuple[int, int]]:
+    """
+    Locate a date value in the raw bytes of a JSON file.
+
+    Args:
+        raw: File contents
+        field_re: Compiled pattern capturing the string value to replace in group 1
+
+    Returns:
+        Tuple of (start, end) offsets of the value, or None if the pattern does
+        not match exactly once
+    """
+    matches = field_re.finditer(raw)
+    match = next(matches, None)
+    if match is None or next(matches, None) is not None:
         return None
 
-    # Extract TAN from metadata.transferTAN
+    return match.span(1)
+
+
+def get_patient_record_tan(data) -> Optional[str]:
+    """Return metadata.transferTAN from parsed patient record data, or None if it is missing."""
     try:
-        tan = data.get('metadata', {}).get('transferTAN')
+        return data.get('metadata', {}).get('transferTAN')
     except (AttributeError, TypeError):
-        tan = None
+        return None
+
+
+def read_file_tan(kind: str, filepath: str, raw: bytes) -> Optional[Tuple[str, Optional[Tuple[object, bool]]]]:
+    """
+    Read the TAN from the contents of a file whose name does not contain one.
+
+    Uses ijson if USE_IJSON is set, so the file is not parsed into memory
+    and is only read up to the TAN. Otherwise the file is parsed in full and
+    the result is returned, so it can be passed on to the processor.
+
+    Args:
+        kind: PATIENT_RECORD or SUBMISSION_REPORT
+        filepath: Path to the JSON file
+        raw: Contents of the file
+
+    Returns:
+        Tuple of (TAN, result of parse_json or None if USE_IJSON is set), or
+        None if the TAN could not be read (reported to stderr)
+    """
+    parsed = None
+    try:
+        if USE_IJSON:
+            if kind == PATIENT_RECORD:
+                tan = peek_patient_record_tan(io.BytesIO(raw))
+            else:
+                tan = peek_submission_report_tan(io.BytesIO(raw))
+        else:
+            parsed = parse_json(raw)
+            data = parsed[0]
+            tan = get_patient_record_tan(data) if kind == PATIENT_RECORD else data.get('id')
+    except JSON_ERRORS as e:
+        print(f"Error: File is not valid JSON: {filepath} - {e}", file=sys.stderr)
+        return None
+    except Exception as e:
+        print(f"Error reading file: {filepath} - {e}", file=sys.stderr)
+        return None
 
     if not tan:
-        print(f"Warning: Could not extract transferTAN from: {filepath}", file=sys.stderr)
+        field = 'transferTAN' if kind == PATIENT_RECORD else 'id'
+        print(f"Warning: Could not extract {field} from: {filepath}", file=sys.stderr)
         return None
 
-    # Check if TAN is in our fix list
-    if tan not in tan_date_map:
+    return tan, parsed
+
+
+def process_patient_record(filepath: str, raw: bytes, new_date: NewDate,
+                           parsed: Optional[Tuple[object, bool]] = None) -> Optional[Tuple[str, bytes]]:
+    """
+    Apply the new date to a patient record file.
+
+    If USE_IJSON is set, the record is streamed to extract the TAN and
+    submittedAt is patched in the raw bytes, so the nested record is never
+    parsed into memory. If submittedAt cannot be located unambiguously, the
+    whole file is parsed, modified and serialized again.
+
+    Args:
+        filepath: Path to the patient record JSON file
+        raw: Contents of the file
+        new_date: New date
+        parsed: Result of parse_json for raw, if it has already been parsed
+
+    Returns:
+        Tuple of (TAN, new file contents), or None if the file cannot be fixed
+    """
+    if USE_IJSON and parsed is None:
+        try:
+            tan, submitted_at_count, submitted_at = scan_patient_record(io.BytesIO(raw))
+        except ijson.JSONError as e:
+            print(f"Error: File is not valid JSON: {filepath} - {e}", file=sys.stderr)
+            return None
+        except Exception as e:
+            print(f"Error reading file: {filepath} - {e}", file=sys.stderr)
+            return None
+
+        if not tan:
+            print(f"Warning: Could not extract transferTAN from: {filepath}", file=sys.stderr)
+            return None
+
+        span = None
+        if submitted_at_count == 1 and not JSON_UNSAFE_RE.search(new_date.utf8):
+            span = find_date_field(raw, SUBMITTED_AT_RE)
+
+        # The single match must be the top-level value, not a nested submittedAt
+        if span is not None and decode_json_string(raw[span[0]:span[1]]) != submitted_at:
+            span = None
+
+        if span is not None:
+            start, end = span
+            return (tan, b''.join((raw[:start], new_date.utf8, raw[end:])))
+
+    if parsed is None:
+        try:
+            parsed = parse_json(raw)
+        except json.JSONDecodeError as e:
+            print(f"Error: File is not valid JSON: {filepath} - {e}", file=sys.stderr)
+            return None
+        except Exception as e:
+            print(f"Error reading file: {filepath} - {e}", file=sys.stderr)
+            return None
+
+    data, use_orjson = parsed
+
+    tan = get_patient_record_tan(data)
+    if not tan:
+        print(f"Warning: Could not extract transferTAN from: {filepath}", file=sys.stderr)
         return None
 
     # Update submittedAt field
-    new_date = tan_date_map[tan]
-    data['submittedAt'] = new_date
+    data['submittedAt'] = new_date.text
 
-    return (tan, new_date, data)
+    return (tan, dump_json(data, use_orjson))
 
 
-def process_submission_report(filepath: str, tan_date_map: Dict[str, str]) -> Optional[Tuple[str, str, dict]]:
+def process_submission_report(filepath: str, raw: bytes, new_date: NewDate,
+                              parsed: Optional[Tuple[object, bool]] = None) -> Optional[Tuple[str, bytes]]:
     """
-    Process a submission report file and check if it needs fixing.
+    Apply the new date to a submission report file.
 
     Args:
         filepath: Path to the submission report JSON file
-        tan_date_map: Dictionary mapping TAN to new date
+        raw: Contents of the file
+        new_date: New date
+        parsed: Result of parse_json for raw, if it has already been parsed
 
     Returns:
-        Tuple of (TAN, new_date, modified_data) if file needs fixing, None otherwise
+        Tuple of (TAN, new file contents), or None if the file cannot be fixed
     """
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"Error: File is not valid JSON: {filepath} - {e}", file=sys.stderr)
-        return None
-    except Exception as e:
-        print(f"Error reading file: {filepath} - {e}", file=sys.stderr)
-        return None
+    if parsed is None:
+        try:
+            parsed = parse_json(raw)
+        except json.JSONDecodeError as e:
+            print(f"Error: File is not valid JSON: {filepath} - {e}", file=sys.stderr)
+            return None
+        except Exception as e:
+            print(f"Error reading file: {filepath} - {e}", file=sys.stderr)
+            return None
+
+    data, use_orjson = parsed
 
     # Extract TAN from id field
     tan = data.get('id')
@@ -240,40 +580,205 @@ def process_submission_report(filepath: str, tan_date_map: Dict[str, str]) -> Op
         print(f"Warning: Could not extract id from: {filepath}", file=sys.stderr)
         return None
 
-    # Check if TAN is in our fix list
-    if tan not in tan_date_map:
-        return None
-
     # Update createdAt field
-    new_date = tan_date_map[tan]
-    data['createdAt'] = new_date
+    data['createdAt'] = new_date.text
 
-    return (tan, new_date, data)
+    return (tan, dump_json(data, use_orjson))
 
 
-def write_output_file(out_dir: str, filename: str, data: dict) -> bool:
+def write_file_bytes(filepath: str, buf: bytes) -> None:
     """
-    Write modified JSON data to output file.
+    Write a complete file with unbuffered os.write calls, normally exactly one.
+
+    Args:
+        filepath: Path of the file to create or overwrite
+        buf: File contents
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        view = memoryview(buf)
+        while view:
+            # os.write may write less than requested, e.g. for very large buffers
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def write_output_file(out_dir: str, filename: str, data: bytes) -> bool:
+    """
+    Write modified JSON file contents to output file.
+
+    The data is written to a temporary file next to the output file, which
+    is then renamed into place, so a failed write never leaves a partial
+    output file behind.
 
     Args:
         out_dir: Output directory path
         filename: Name of the file to create
-        data: JSON data to write
+        data: Serialized file contents
 
     Returns:
         True if successful, False otherwise
     """
     filepath = os.path.join(out_dir, filename)
+    tmp_filepath = filepath + '.tmp'
 
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_file_bytes(tmp_filepath, data)
+        os.replace(tmp_filepath, filepath)
         return True
     except Exception as e:
         print(f"Error writing file: {filepath} - {e}", file=sys.stderr)
+        try:
+            os.remove(tmp_filepath)
+        except OSError:
+            pass
         return False
 
 
+def write_lines(lines: List[str]) -> None:
+    """
+    Write console lines to stdout with a single write call.
+
+    Args:
+        lines: Lines to write, without trailing newlines
+    """
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+
+# Worker state, set once per process by init_worker
+_worker_tan_date_map: Dict[str, NewDate] = {}
+_worker_out_dir = ''
+
+
+def init_worker(tan_date_map: Dict[str, NewDate], out_dir: str) -> None:
+    """
+    Initialize the per-process state used by process_files.
+
+    Args:
+        tan_date_map: Dictionary mapping TAN to new date
+        out_dir: Output directory path
+    """
+    global _worker_tan_date_map, _worker_out_dir
+    _worker_tan_date_map = tan_date_map
+    _worker_out_dir = out_dir
+
+
+def process_one(task: Tuple[str, str, str, Optional[str]], raw: bytes) -> Tuple[str, Optional[str], Optional[NewDate], Optional[bytes]]:
+    """
+    Check a single input file and apply the date fix.
+
+    Files are only parsed once their TAN is known to be in the config. The
+    TAN comes from the filename, or for files without one, from the file
+    contents; a full parse done for that is reused by the processor.
+
+    Args:
+        task: Tuple of (kind, filename, filepath, TAN from filename)
+        raw: Contents of the file
+
+    Returns:
+        Tuple of (status, TAN, new_date, modified_data), where status is 'fix'
+        if modified_data needs to be written, 'error' or 'skipped'
+    """
+    kind, filename, filepath, file_tan = task
+
+    parsed = None
+    if file_tan is None:
+        result = read_file_tan(kind, filepath, raw)
+        if result is None:
+            return ('skipped', None, None, None)
+        file_tan, parsed = result
+
+    new_date = _worker_tan_date_map.get(file_tan)
+    if new_date is None:
+        return ('skipped', None, None, None)
+
+    if kind == PATIENT_RECORD:
+        result = process_patient_record(filepath, raw, new_date, parsed)
+    else:
+        result = process_submission_report(filepath, raw, new_date, parsed)
+
+    if not result:
+        return ('skipped', None, None, None)
+
+    tan, data = result
+    if tan != file_tan:
+        print(f"Error: TAN in file does not match filename: {filepath}", file=sys.stderr)
+        return ('error', tan, new_date, None)
+
+    return ('fix', tan, new_date, data)
+
+
+def process_files(tasks: List[Tuple[str, str, str, Optional[str]]]) -> Tuple[int, int, List[str]]:
+    """
+    Process and write a chunk of input files.
+
+    Files are read by one thread pool ahead of processing and written by
+    another, so disk I/O overlaps with JSON processing. At most
+    READ_AHEAD_LIMIT files are held in memory on either side.
+
+    Args:
+        tasks: List of (kind, filename, filepath, TAN from filename) tuples
+
+    Returns:
+        Tuple of (modified_count, error_count, log_lines), where log_lines
+        holds the console message for each modified file in task order
+    """
+    modified_count = 0
+    error_count = 0
+    log_lines = []
+    reads = deque()
+    writes = deque()
+
+    with ThreadPoolExecutor(max_workers=IO_THREADS) as readers, \
+            ThreadPoolExecutor(max_workers=IO_THREADS) as writers:
+
+        def finish_write():
+            nonlocal modified_count, error_count
+            kind, tan, new_date, future = writes.popleft()
+            if future.result():
+                log_lines.append(f"Fixed {kind} - TAN: {tan}, Date: {new_date.text}")
+                modified_count += 1
+            else:
+                error_count += 1
+
+        def process_next():
+            nonlocal error_count
+            task, future = reads.popleft()
+            try:
+                raw = future.result()
+            except Exception as e:
+                print(f"Error reading file: {task[2]} - {e}", file=sys.stderr)
+                return
+
+            status, tan, new_date, data = process_one(task, raw)
+            del raw
+            if status == 'error':
+                error_count += 1
+            if status != 'fix':
+                return
+
+            writes.append((task[0], tan, new_date, writers.submit(write_output_file, _worker_out_dir, task[1], data)))
+            if len(writes) > READ_AHEAD_LIMIT:
+                finish_write()
+
+        for task in tasks:
+            reads.append((task, readers.submit(read_input_file, task[2])))
+            if len(reads) > READ_AHEAD_LIMIT:
+                process_next()
+
+        while reads:
+            process_next()
+        while writes:
+            finish_write()
+
+    return modified_count, error_count, log_lines
+
+
 def main():
     """Main entry point for the DNPM fix-up tool."""
     args = parse_arguments()
@@ -288,42 +793,53 @@ def main():
         print("Error: No valid TAN/date pairs found in config file", file=sys.stderr)
         sys.exit(1)
 
+    if args.jobs < 1:
+        print("Error: --jobs must be at least 1", file=sys.stderr)
+        sys.exit(1)
+
     print(f"Number of TAN/date pairs to fix: {len(tan_date_map)}")
 
     # Get JSON files from input directory
-    patient_record_files, submission_report_files = get_json_files(args.in_dir)
+    files_by_tan, patient_record_count, submission_report_count = get_json_files(args.in_dir, tan_date_map)
+
+    print(f"Found {patient_record_count} patient record files")
+    print(f"Found {submission_report_count} submission report files")
 
-    print(f"Found {len(patient_record_files)} patient record files")
-    print(f"Found {len(submission_report_files)} submission report files")
+    # Only files whose filename TAN is targeted (or unknown) need to be opened
+    tasks = []
+    for tan in tan_date_map:
+        tasks.extend(files_by_tan.get(tan, ()))
+    tasks.extend(files_by_tan.get(None, ()))
 
     modified_count = 0
     error_count = 0
+    log_lines = []
+
+    # Files are independent, so chunks are spread over worker processes;
+    # a single chunk is processed in this process to avoid the startup cost
+    chunks = [tasks[i:i + CHUNK_SIZE] for i in range(0, len(tasks), CHUNK_SIZE)]
+    jobs = min(args.jobs, len(chunks))
+    if jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                       initargs=(tan_date_map, args.out_dir))
+        chunk_results = executor.map(process_files, chunks)
+    else:
+        executor = None
+        init_worker(tan_date_map, args.out_dir)
+        chunk_results = map(process_files, chunks)
 
-    # Process patient record files
-    for filename in patient_record_files:
-        filepath = os.path.join(args.in_dir, filename)
-        result = process_patient_record(filepath, tan_date_map)
-
-        if result:
-            tan, new_date, data = result
-            if write_output_file(args.out_dir, filename, data):
-                print(f"Fixed patient record - TAN: {tan}, Date: {new_date}")
-                modified_count += 1
-            else:
-                error_count += 1
-
-    # Process submission report files
-    for filename in submission_report_files:
-        filepath = os.path.join(args.in_dir, filename)
-        result = process_submission_report(filepath, tan_date_map)
-
-        if result:
-            tan, new_date, data = result
-            if write_output_file(args.out_dir, filename, data):
-                print(f"Fixed submission report - TAN: {tan}, Date: {new_date}")
-                modified_count += 1
-            else:
-                error_count += 1
+    try:
+        for chunk_modified, chunk_errors, chunk_lines in chunk_results:
+            modified_count += chunk_modified
+            error_count += chunk_errors
+            log_lines.extend(chunk_lines)
+            if len(log_lines) >= LOG_BATCH_SIZE:
+                write_lines(log_lines)
+                log_lines.clear()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    write_lines(log_lines)
 
     # Summary
     print(f"\nSummary:")